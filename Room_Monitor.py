@@ -18,19 +18,26 @@ Wiring assumption for INPUT zones:
 # ============================================================
 # Standard libs
 # ============================================================
+import atexit
+import hashlib
+import heapq
 import json
 import logging
 import os
+import queue
 import re
+import sched
+import select
 import signal
 import socket
 import subprocess
 import sys
+import textwrap
 import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional, Dict, Tuple, Any
 
 # ============================================================
@@ -39,6 +46,29 @@ from typing import Optional, Dict, Tuple, Any
 import RPi.GPIO as GPIO
 import paho.mqtt.client as mqtt
 
+# Optional C-accelerated JSON; stdlib fallback produces equivalent output.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, sort_keys=True)
+
+    _loads = json.loads
+
+# Optional libgpiod v2 bindings: lets the poll fallback read every polled
+# pin with one gpiochip ioctl instead of one GPIO.input call per zone.
+try:
+    import gpiod
+    _HAS_GPIOD = hasattr(gpiod, "request_lines")  # v2 API only
+except ImportError:
+    gpiod = None
+    _HAS_GPIOD = False
+
 # ============================================================
 # Tiny dotenv loader (no extra dependency)
 # ============================================================
@@ -76,10 +106,13 @@ HA_DISCOVERY_PREFIX = _env_clean(os.getenv("HA_DISCOVERY_PREFIX", "homeassistant
 # ============================================================
 # HOSTNAME -> DEVICE ID (automatic)
 # ============================================================
+_SLUG_RE = re.compile(r"[^a-z0-9_]+")
+_UNDERSCORE_RE = re.compile(r"_+")
+
 def slugify(s: str) -> str:
     s = (s or "").strip().lower()
-    s = re.sub(r"[^a-z0-9_]+", "_", s)
-    s = re.sub(r"_+", "_", s).strip("_")
+    s = _SLUG_RE.sub("_", s)
+    s = _UNDERSCORE_RE.sub("_", s).strip("_")
     return s or "monitor"
 
 HOST = slugify(socket.gethostname())      # e.g. "shed1"
@@ -90,7 +123,8 @@ DEVICE_NAME = HOST                        # shown as device name in HA
 # CONTACT / ZONE CONFIG
 # ============================================================
 BOUNCE_MS = 120
-POLL_INTERVAL_SEC = 0.05  # main loop tick
+POLL_INTERVAL_SEC = 0.05  # fallback tick for pins without edge detection
+_EDGE_COALESCE_SEC = 0.05  # window for folding an edge burst into one publish
 
 # IMPORTANT: keep your pin mapping exactly as-is
 SENSORS: Dict[str, Dict[str, Any]] = {
@@ -163,7 +197,7 @@ def load_zone_classes() -> Dict[str, str]:
         if not os.path.exists(CONFIG_PATH):
             return {}
         with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            data = _loads(f.read())
         out: Dict[str, str] = {}
         for k, v in (data or {}).items():
             kk = str(k).strip()
@@ -188,6 +222,26 @@ _persisted = load_zone_classes()
 for zk, cls in _persisted.items():
     SENSORS[zk]["device_class"] = cls
 
+# In-memory mirror of the persisted class map so class changes don't have
+# to re-read and re-parse the config file just to update one key.
+_ZONE_CLASS_CACHE: Dict[str, str] = dict(_persisted)
+
+# One bit per zone: open/closed packs into an int so "anything open?" is a
+# single mask test and the open list is O(open count).
+_ZONE_BIT = {k: 1 << i for i, k in enumerate(ZONE_KEYS)}
+
+# Per-zone output flag so hot paths get a plain dict hit instead of
+# re-normalizing the class string every lookup. Refreshed (with
+# _INPUT_MASK) whenever a zone class changes.
+_IS_OUTPUT: Dict[str, bool] = {
+    k: is_output_class(SENSORS[k].get("device_class", "")) for k in ZONE_KEYS
+}
+
+def _compute_input_mask() -> int:
+    return sum(b for k, b in _ZONE_BIT.items() if not _IS_OUTPUT[k])
+
+_INPUT_MASK = _compute_input_mask()
+
 # ============================================================
 # OLED CONFIG (OPTIONAL)
 # ============================================================
@@ -196,7 +250,7 @@ OLED_I2C_PORT = 1
 OLED_I2C_ADDR = 0x3C
 OLED_DRIVER = "sh1106"   # "sh1106" or "ssd1306"
 OLED_ROTATE = 0
-OLED_UPDATE_SEC = 0.5
+OLED_DEBOUNCE_SEC = 0.1  # coalesce bursts of error changes into one redraw
 
 # ============================================================
 # CPU THROTTLE MONITOR
@@ -233,21 +287,108 @@ P_LOW = 90
 # Runtime globals
 # ============================================================
 RUNNING = True
+_shutdown_requested = False  # set by handle_exit; quiets disconnect errors
 
+# _contact_states is treated as immutable: the writer (edge path) builds a
+# fresh dict under _state_lock and rebinds the name, which is atomic under
+# the GIL. Readers grab the current reference and never lock.
 _state_lock = threading.Lock()
-_contact_states = {k: False for k in SENSORS.keys()}  # True=open, False=closed
+_contact_states: Dict[str, bool] = {k: False for k in SENSORS.keys()}  # True=open, False=closed
+_contact_bitmask = 0  # set bit = zone open; mirrors _contact_states
 _mqtt_ok = False
 
-_last_contact_change_key: Optional[str] = None
-_last_contact_change_is_open: Optional[bool] = None
+# (sensor_key, is_open) of the most recent contact change; rebound atomically.
+_last_change: Optional[Tuple[str, bool]] = None
+
+# (zone, class) dropdown selection; always read/written as one tuple so a
+# plain atomic rebind replaces the old _select_lock.
+_selection: Tuple[str, str] = (ZONE_PLACEHOLDER, CLASS_PLACEHOLDER)
+
+# Edge events land here (from the RPi.GPIO callback thread) and are drained
+# by the MQTT publisher thread, so callbacks never touch the network.
+_EDGE_QUEUE: "queue.Queue[str]" = queue.Queue()
 
-_select_lock = threading.Lock()
-_selected_zone = ZONE_PLACEHOLDER
-_selected_class = CLASS_PLACEHOLDER
+# Zones where add_event_detect failed; main loop polls these as a fallback.
+_polled_keys: set[str] = set()
+
+# Flat (zone_key, pin) rows for the poll fallback, rebuilt whenever the
+# poll set or a zone class changes. The hot loop iterates this tuple with
+# pins pre-resolved instead of chasing SENSORS[k]["pin"] dicts per tick,
+# and the rebind is atomic so readers never need a lock.
+_POLL_ROWS: Tuple[Tuple[str, int], ...] = ()
+
+def _rebuild_poll_rows() -> None:
+    global _POLL_ROWS
+    _POLL_ROWS = tuple(
+        (k, int(SENSORS[k]["pin"]))
+        for k in ZONE_KEYS
+        if k in _polled_keys and not _IS_OUTPUT[k]
+    )
+    _rebuild_gpiod_request()
+
+# Active gpiod line request covering the _POLL_ROWS pins, or None when
+# gpiod is unavailable or the lines can't be claimed (e.g. RPi.GPIO still
+# owns them) — the loop then falls back to per-pin GPIO.input.
+_gpiod_req = None
+
+def _release_gpiod_request() -> None:
+    global _gpiod_req
+    if _gpiod_req is not None:
+        try:
+            _gpiod_req.release()
+        except Exception:
+            pass
+        _gpiod_req = None
+
+def _rebuild_gpiod_request() -> None:
+    global _gpiod_req
+    _release_gpiod_request()
+    if not (_HAS_GPIOD and _POLL_ROWS):
+        return
+    try:
+        settings = gpiod.LineSettings(
+            direction=gpiod.line.Direction.INPUT,
+            bias=gpiod.line.Bias.PULL_UP,  # match the RPi.GPIO PUD_UP setup
+        )
+        _gpiod_req = gpiod.request_lines(
+            "/dev/gpiochip0",
+            consumer=HOST,
+            config={tuple(pin for _, pin in _POLL_ROWS): settings},
+        )
+    except Exception:
+        _gpiod_req = None
+
+def _read_polled_levels(rows):
+    """Levels for the poll rows as 0/1 ints: one batched ioctl when the
+    gpiod request is live, per-pin GPIO.input otherwise."""
+    req = _gpiod_req
+    if req is not None:
+        try:
+            vals = req.get_values()
+            if len(vals) == len(rows):
+                return [v.value for v in vals]
+        except Exception:
+            pass
+    return [GPIO.input(pin) for _, pin in rows]
 
 # ============================================================
 # Loggers
 # ============================================================
+# All loggers enqueue records onto one queue; a single QueueListener thread
+# drains it to the rotating files, so hot callers never block on file I/O
+# or contend on per-handler locks.
+_LOG_QUEUE: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_LOG_FILE_HANDLERS: list[logging.Handler] = []
+
+class _LoggerNameFilter(logging.Filter):
+    """Routes queued records to the file handler of the logger that made them."""
+    def __init__(self, name: str):
+        super().__init__()
+        self._name = name
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name == self._name
+
 def make_logger(name: str, path: str, level=logging.INFO) -> logging.Logger:
     os.makedirs(os.path.dirname(path), exist_ok=True)
     logger = logging.getLogger(name)
@@ -257,66 +398,111 @@ def make_logger(name: str, path: str, level=logging.INFO) -> logging.Logger:
         h = RotatingFileHandler(path, maxBytes=2_000_000, backupCount=5)
         fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
         h.setFormatter(fmt)
-        logger.addHandler(h)
+        h.addFilter(_LoggerNameFilter(name))
+        _LOG_FILE_HANDLERS.append(h)
+        logger.addHandler(QueueHandler(_LOG_QUEUE))
     return logger
 
 CORE_LOG = make_logger("core", CORE_LOG_PATH)
 SVC_LOG = make_logger("service", SERVICE_LOG_PATH)
 CHROM_LOG = make_logger("chrom", CHROM_LOG_PATH)
 
+_LOG_LISTENER = QueueListener(_LOG_QUEUE, *_LOG_FILE_HANDLERS, respect_handler_level=True)
+_LOG_LISTENER.start()
+atexit.register(_LOG_LISTENER.stop)
+
 # ============================================================
 # Topics / util
 # ============================================================
-def availability_topic() -> str:
-    return f"{HOST}/availability"
+# Per-zone topic strings never change after boot; build them once instead of
+# re-formatting f-strings on every publish/edge event.
+ZONE_TOPICS: Dict[str, Dict[str, str]] = {
+    k: {
+        "state":    f"{HOST}_{k}/state",
+        "sw_state": f"{HOST}_{k}/switch/state",
+        "sw_cmd":   f"{HOST}_{k}/switch/set",
+        "disc_bin": f"{HA_DISCOVERY_PREFIX}/binary_sensor/{HOST}/{k}/config",
+        "disc_sw":  f"{HA_DISCOVERY_PREFIX}/switch/{HOST}/{k}/config",
+    }
+    for k in ZONE_KEYS
+}
+
+# Zero-arg topics are plain constants, same as the select topics below.
+AVAILABILITY_TOPIC = f"{HOST}/availability"
 
 def contact_state_topic(sensor_key: str) -> str:
-    return f"{HOST}_{sensor_key}/state"
+    return ZONE_TOPICS[sensor_key]["state"]
 
 def contact_discovery_topic(sensor_key: str) -> str:
-    return f"{HA_DISCOVERY_PREFIX}/binary_sensor/{HOST}/{sensor_key}/config"
+    return ZONE_TOPICS[sensor_key]["disc_bin"]
 
 def switch_state_topic(sensor_key: str) -> str:
-    return f"{HOST}_{sensor_key}/switch/state"
+    return ZONE_TOPICS[sensor_key]["sw_state"]
 
 def switch_command_topic(sensor_key: str) -> str:
-    return f"{HOST}_{sensor_key}/switch/set"
+    return ZONE_TOPICS[sensor_key]["sw_cmd"]
 
 def switch_discovery_topic(sensor_key: str) -> str:
-    return f"{HA_DISCOVERY_PREFIX}/switch/{HOST}/{sensor_key}/config"
+    return ZONE_TOPICS[sensor_key]["disc_sw"]
+
+# Exact switch-command topic -> zone key, so _on_message resolves the zone
+# with one dict lookup instead of parsing the topic string.
+_TOPIC_TO_ZONE: Dict[str, str] = {v["sw_cmd"]: k for k, v in ZONE_TOPICS.items()}
 
 TOP_ZONE_SET = f"{HOST}/zone_select/set"
 TOP_CLASS_SET = f"{HOST}/class_select/set"
 TOP_ZONE_STATE = f"{HOST}/zone_select/state"
 TOP_CLASS_STATE = f"{HOST}/class_select/state"
 
-def zone_select_discovery_topic() -> str:
-    return f"{HA_DISCOVERY_PREFIX}/select/{HOST}/zone_select/config"
+ZONE_SELECT_DISCOVERY_TOPIC = f"{HA_DISCOVERY_PREFIX}/select/{HOST}/zone_select/config"
+CLASS_SELECT_DISCOVERY_TOPIC = f"{HA_DISCOVERY_PREFIX}/select/{HOST}/class_select/config"
 
-def class_select_discovery_topic() -> str:
-    return f"{HA_DISCOVERY_PREFIX}/select/{HOST}/class_select/config"
+_IP_CACHE_TTL_SEC = 60.0
+# Seeded already-expired: monotonic() is small right after boot, so a 0.0
+# timestamp would make the first call (as a boot service) return "n/a"
+# without ever trying the lookup.
+_cached_ip: Tuple[float, str] = (-_IP_CACHE_TTL_SEC, "n/a")
 
 def _get_ip_best_effort() -> str:
+    global _cached_ip
+    ts, ip = _cached_ip
+    now = time.monotonic()
+    if now - ts < _IP_CACHE_TTL_SEC:
+        return ip
     try:
-        out = subprocess.check_output(["hostname", "-I"], text=True).strip()
-        if out:
-            return out.split()[0]
+        # Connecting a UDP socket picks the outbound interface without
+        # sending a packet; no subprocess fork needed.
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
+        finally:
+            s.close()
     except Exception:
-        pass
-    return "n/a"
+        ip = "n/a"
+    _cached_ip = (now, ip)
+    return ip
+
+def _freeze(x: Any) -> Any:
+    """Recursively converts dicts/lists to hashable tuples for comparison."""
+    if isinstance(x, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in x.items()))
+    if isinstance(x, (list, tuple)):
+        return tuple(_freeze(v) for v in x)
+    if isinstance(x, set):
+        return tuple(sorted(_freeze(v) for v in x))
+    return x
 
 def _fingerprint(priority: int, message: str, meta: Optional[dict]) -> Tuple[Any, ...]:
-    return (priority, message, json.dumps(meta, sort_keys=True) if meta is not None else None)
+    # Only ever compared for equality; freezing to tuples is far cheaper
+    # than serializing the meta dict to JSON on every raise_error.
+    return (priority, message, _freeze(meta) if meta is not None else None)
 
 def get_open_keys_ordered() -> list[str]:
-    with _state_lock:
-        keys: list[str] = []
-        for k, meta in SENSORS.items():
-            if is_output_class(meta.get("device_class", "")):
-                continue
-            if _contact_states.get(k, False):
-                keys.append(k)
-        return keys
+    m = _contact_bitmask & _INPUT_MASK  # atomic int reads; no lock needed
+    if not m:
+        return []
+    return [k for k, b in _ZONE_BIT.items() if m & b]
 
 # ============================================================
 # ErrorBus
@@ -337,13 +523,30 @@ class ErrorBus:
         self._errors: Dict[str, ErrorItem] = {}
         self._dirty = True
         self._last_logged_fp: Dict[str, Tuple[Any, ...]] = {}
+        # (priority, since, key) min-heap so snapshot_top avoids a full scan.
+        # Stale entries (cleared keys / changed priorities) are dropped lazily
+        # when they surface at the top.
+        self._heap: list[Tuple[int, datetime, str]] = []
+        # Set whenever the bus goes dirty; the OLED thread blocks on this
+        # instead of polling snapshot_top on a timer. Starts set so the
+        # display gets an initial paint (bus starts dirty).
+        self.change_event = threading.Event()
+        self.change_event.set()
+        # Error keys come from a small fixed set; memoize the routing so
+        # raise/clear skip the prefix checks after the first hit.
+        self._logger_cache: Dict[str, logging.Logger] = {}
 
     def _route_logger(self, key: str) -> logging.Logger:
-        if key.startswith("CPU_") or key.startswith("THROTTLE") or key == "CPU_THROTTLE":
-            return CORE_LOG
-        if key.startswith("CHROM") or key.startswith("CHROMIUM"):
-            return CHROM_LOG
-        return SVC_LOG
+        lg = self._logger_cache.get(key)
+        if lg is None:
+            if key.startswith("CPU_") or key.startswith("THROTTLE") or key == "CPU_THROTTLE":
+                lg = CORE_LOG
+            elif key.startswith("CHROM") or key.startswith("CHROMIUM"):
+                lg = CHROM_LOG
+            else:
+                lg = SVC_LOG
+            self._logger_cache[key] = lg
+        return lg
 
     def raise_error(self, key: str, message: str, priority: int, meta: Optional[dict] = None, kind: str = "error"):
         now = datetime.now()
@@ -352,8 +555,17 @@ class ErrorBus:
 
         with self._lock:
             existed = key in self._errors
+            if existed and self._last_logged_fp.get(key) == fp:
+                # Same error, same fingerprint (common during outage storms):
+                # just bump the counters; no dirty flag, no redraw, no log.
+                e = self._errors[key]
+                e.last_update = now
+                e.count += 1
+                return
             if existed:
                 e = self._errors[key]
+                if e.priority != priority:
+                    heapq.heappush(self._heap, (priority, e.since, key))
                 e.message = message
                 e.priority = priority
                 e.last_update = now
@@ -365,11 +577,13 @@ class ErrorBus:
                     key=key, message=message, priority=priority,
                     since=now, last_update=now, count=1, meta=meta
                 )
+                heapq.heappush(self._heap, (priority, now, key))
             self._dirty = True
+            self.change_event.set()
 
             prev_fp = self._last_logged_fp.get(key)
             if (not existed) or (prev_fp != fp):
-                logger.info(f"[{kind.upper()}] {key} prio={priority} msg={message}")
+                logger.info("[%s] %s prio=%s msg=%s", kind.upper(), key, priority, message)
                 self._last_logged_fp[key] = fp
 
     def clear_error(self, key: str, kind: str = "error"):
@@ -379,13 +593,30 @@ class ErrorBus:
                 e = self._errors[key]
                 del self._errors[key]
                 self._dirty = True
-                logger.info(f"[{kind.upper()}-CLEAR] {key} resolved (was prio={e.priority} msg={e.message})")
+                self.change_event.set()
+                logger.info("[%s-CLEAR] %s resolved (was prio=%s msg=%s)", kind.upper(), key, e.priority, e.message)
                 self._last_logged_fp.pop(key, None)
+                # snapshot_top prunes lazily, but only the OLED calls it
+                # and the OLED is optional — on a headless unit every
+                # raise/clear cycle would leak a tombstone forever. Pop
+                # dead tops here and rebuild once tombstones dominate.
+                while self._heap and self._heap[0][2] not in self._errors:
+                    heapq.heappop(self._heap)
+                if len(self._heap) > 2 * len(self._errors) + 8:
+                    self._heap = [(it.priority, it.since, k) for k, it in self._errors.items()]
+                    heapq.heapify(self._heap)
 
     def snapshot_top(self) -> Tuple[Optional[ErrorItem], bool]:
         with self._lock:
             if not self._errors:
                 return None, self._dirty
+            while self._heap:
+                prio, since, key = self._heap[0]
+                e = self._errors.get(key)
+                if e is not None and e.priority == prio and e.since == since:
+                    return e, self._dirty
+                heapq.heappop(self._heap)  # stale entry
+            # Heap exhausted (shouldn't happen); rebuild from the dict.
             top = min(self._errors.values(), key=lambda e: (e.priority, e.since))
             return top, self._dirty
 
@@ -398,17 +629,43 @@ ERRORS = ErrorBus()
 # ============================================================
 # CPU throttling snapshot
 # ============================================================
+# Hard cap on vcgencmd runtime: the poll runs on the shared _SCHED thread,
+# and a wedged firmware mailbox must not stall the tap auto-offs behind it.
+_SH_TIMEOUT_SEC = 2.0
+
 def _sh(cmd: list[str]) -> str:
-    return subprocess.check_output(cmd, text=True).strip()
+    return subprocess.check_output(cmd, text=True, timeout=_SH_TIMEOUT_SEC).strip()
+
+# Temp and ARM clock are in sysfs; only the throttle bits need vcgencmd.
+# Keep the files open and pread() so each poll skips path resolution too.
+_SYSFS_TEMP_PATH = "/sys/class/thermal/thermal_zone0/temp"
+_SYSFS_ARM_FREQ_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+_sysfs_fds: Dict[str, int] = {}
+
+def _read_sysfs(path: str) -> Optional[str]:
+    try:
+        fd = _sysfs_fds.get(path)
+        if fd is None:
+            fd = os.open(path, os.O_RDONLY)
+            _sysfs_fds[path] = fd
+        return os.pread(fd, 64, 0).decode("ascii", errors="ignore").strip()
+    except Exception:
+        _sysfs_fds.pop(path, None)
+        return None
 
 def vcgencmd_snapshot() -> dict:
     snap: dict = {}
     try:
         thr_raw = _sh(["vcgencmd", "get_throttled"])
-        temp = _sh(["vcgencmd", "measure_temp"])
-        vcore = _sh(["vcgencmd", "measure_volts", "core"])
-        arm = _sh(["vcgencmd", "measure_clock", "arm"])
-        coreclk = _sh(["vcgencmd", "measure_clock", "core"])
+
+        raw_temp = _read_sysfs(_SYSFS_TEMP_PATH)
+        if raw_temp is not None:
+            temp = f"temp={int(raw_temp) / 1000:.1f}'C"
+        else:
+            temp = _sh(["vcgencmd", "measure_temp"])
+
+        raw_freq = _read_sysfs(_SYSFS_ARM_FREQ_PATH)
+        arm = f"frequency(arm)={int(raw_freq) * 1000}" if raw_freq is not None else "n/a"
 
         m = re.search(r"0x[0-9a-fA-F]+", thr_raw)
         thr_val = int(m.group(0), 16) if m else 0
@@ -428,6 +685,15 @@ def vcgencmd_snapshot() -> dict:
         if bit(0x40000): flags_past.append("THROTTLED")
         if bit(0x80000): flags_past.append("SOFT_TEMP")
 
+        # Core volts/clock aren't in sysfs; only shell out for them when
+        # something is actually flagged (they're only logged on throttle).
+        if thr_val:
+            vcore = _sh(["vcgencmd", "measure_volts", "core"])
+            coreclk = _sh(["vcgencmd", "measure_clock", "core"])
+        else:
+            vcore = "n/a"
+            coreclk = "n/a"
+
         snap.update({
             "throttled_raw": thr_raw,
             "throttled_val": hex(thr_val),
@@ -449,40 +715,48 @@ def log_throttle_snapshot(prefix: str, snap: dict):
         f"| arm={snap.get('arm')} core={snap.get('coreclk')}"
     )
 
-def throttle_monitor_loop():
-    last_now_fp: Optional[Tuple[str, ...]] = None
-    while RUNNING:
-        snap = vcgencmd_snapshot()
-        if "error" in snap:
-            ERRORS.raise_error("CPU_THROTTLE_READ", f"vcgencmd read failed: {snap['error']}", P_MEDHIGH, kind="error")
-            time.sleep(THROTTLE_POLL_SEC)
-            continue
-        else:
-            ERRORS.clear_error("CPU_THROTTLE_READ", kind="error")
-
-        now_flags = tuple(snap.get("flags_now") or [])
-        fp = now_flags
-
-        if fp != last_now_fp:
-            if now_flags:
-                short = " ".join(now_flags)
-                ERRORS.raise_error(
-                    "CPU_THROTTLE",
-                    f"THROTTLE {short} | {snap.get('temp')} | {snap.get('vcore')}",
-                    P_MEDHIGH,
-                    meta=snap,
-                    kind="error"
-                )
-                log_throttle_snapshot("THROTTLE_ACTIVE", snap)
-            else:
-                ERRORS.clear_error("CPU_THROTTLE", kind="error")
-                CORE_LOG.info(
-                    f"THROTTLE_CLEAR | past={snap.get('flags_past')} | {snap.get('throttled_raw')} "
-                    f"| {snap.get('temp')} | {snap.get('vcore')}"
-                )
-            last_now_fp = fp
+# Throttle polling runs as a recurring event on the shared _SCHED thread
+# (the one the tap auto-offs use) instead of its own daemon thread, so on
+# a single-core Pi it stops competing with the MQTT and GPIO threads.
+_throttle_last_fp: Optional[Tuple[str, ...]] = None
+_throttle_read_err = False
 
-        time.sleep(THROTTLE_POLL_SEC)
+def _throttle_tick():
+    global _throttle_last_fp, _throttle_read_err
+    if not RUNNING:
+        return
+    _SCHED.enter(THROTTLE_POLL_SEC, 1, _throttle_tick)
+
+    snap = vcgencmd_snapshot()
+    if "error" in snap:
+        _throttle_read_err = True
+        ERRORS.raise_error("CPU_THROTTLE_READ", f"vcgencmd read failed: {snap['error']}", P_MEDHIGH, kind="error")
+        return
+    elif _throttle_read_err:
+        _throttle_read_err = False
+        ERRORS.clear_error("CPU_THROTTLE_READ", kind="error")
+
+    now_flags = tuple(snap.get("flags_now") or [])
+    fp = now_flags
+
+    if fp != _throttle_last_fp:
+        if now_flags:
+            short = " ".join(now_flags)
+            ERRORS.raise_error(
+                "CPU_THROTTLE",
+                f"THROTTLE {short} | {snap.get('temp')} | {snap.get('vcore')}",
+                P_MEDHIGH,
+                meta=snap,
+                kind="error"
+            )
+            log_throttle_snapshot("THROTTLE_ACTIVE", snap)
+        else:
+            ERRORS.clear_error("CPU_THROTTLE", kind="error")
+            CORE_LOG.info(
+                f"THROTTLE_CLEAR | past={snap.get('flags_past')} | {snap.get('throttled_raw')} "
+                f"| {snap.get('temp')} | {snap.get('vcore')}"
+            )
+        _throttle_last_fp = fp
 
 # ============================================================
 # OLED manager (error-only, fail-silent)
@@ -491,16 +765,25 @@ class OledManager:
     def __init__(self):
         self.available = False
         self.device = None
-        self._canvas = None
         self._font = None
+        self._image_mod = None
+        self._draw_mod = None
+        # The top error rarely changes between redraws; cache its wrapped
+        # lines so repeat draws skip the string work.
+        self._last_top: Optional[Tuple[str, str]] = None
+        self._cached_lines: Tuple[str, str, str] = ("", "", "")
+        # Pre-rendered static header and last key line (text rasterization
+        # is the expensive part of a draw on this device).
+        self._header_img = None
+        self._key_img = None
+        self._key_img_key: Optional[str] = None
 
     def start(self) -> None:
         if not OLED_ENABLED:
             return
         try:
             from luma.core.interface.serial import i2c
-            from luma.core.render import canvas
-            from PIL import ImageFont
+            from PIL import Image, ImageDraw, ImageFont
 
             if OLED_DRIVER.lower() == "sh1106":
                 from luma.oled.device import sh1106 as oled_dev
@@ -509,9 +792,14 @@ class OledManager:
 
             serial = i2c(port=OLED_I2C_PORT, address=OLED_I2C_ADDR)
             self.device = oled_dev(serial, rotate=OLED_ROTATE)
-            self._canvas = canvas
+            self._image_mod = Image
+            self._draw_mod = ImageDraw
             self._font = ImageFont.load_default()
 
+            # Render the static "ERROR" banner once; frames just paste it.
+            self._header_img = Image.new("1", (self.device.width, 14))
+            ImageDraw.Draw(self._header_img).text((0, 0), "ERROR", font=self._font, fill=255)
+
             try:
                 self.device.contrast(255)
                 self.device.clear()
@@ -528,21 +816,25 @@ class OledManager:
 
     def _loop(self) -> None:
         while RUNNING:
+            # Block until the ErrorBus actually changes; the timeout only
+            # keeps the RUNNING check responsive.
+            if not ERRORS.change_event.wait(timeout=5.0):
+                continue
+            time.sleep(OLED_DEBOUNCE_SEC)
+            ERRORS.change_event.clear()
             try:
                 self._draw_once()
             except Exception:
                 self.available = False
                 return
-            time.sleep(OLED_UPDATE_SEC)
 
     def _clear(self) -> None:
-        if not self.available or not self.device or not self._canvas:
+        if not self.available or not self.device or not self._image_mod:
             return
-        with self._canvas(self.device):
-            pass
+        self.device.display(self._image_mod.new("1", (self.device.width, self.device.height)))
 
     def _draw_once(self) -> None:
-        if not self.available or not self.device or not self._canvas or not self._font:
+        if not self.available or not self.device or not self._image_mod or not self._font:
             return
 
         top, dirty = ERRORS.snapshot_top()
@@ -557,20 +849,30 @@ class OledManager:
             ERRORS.mark_clean()
             return
 
-        with self._canvas(self.device) as draw:
-            draw.text((0, 0), "ERROR", font=self._font, fill=255)
-            draw.text((0, 14), f"{top.key}", font=self._font, fill=255)
+        if self._last_top != (top.key, top.message):
+            wrapped = textwrap.wrap((top.message or "")[:96], 21)[:3]
+            wrapped += [""] * (3 - len(wrapped))
+            self._cached_lines = (wrapped[0], wrapped[1], wrapped[2])
+            self._last_top = (top.key, top.message)
+        line1, line2, line3 = self._cached_lines
 
-            msg = (top.message or "")[:96]
-            line1 = msg[:21]
-            line2 = msg[21:42] if len(msg) > 21 else ""
-            line3 = msg[42:63] if len(msg) > 42 else ""
+        if self._key_img_key != top.key:
+            self._key_img = self._image_mod.new("1", (self.device.width, 14))
+            self._draw_mod.Draw(self._key_img).text((0, 0), f"{top.key}", font=self._font, fill=255)
+            self._key_img_key = top.key
 
-            draw.text((0, 28), line1, font=self._font, fill=255)
-            if line2:
-                draw.text((0, 40), line2, font=self._font, fill=255)
-            if line3:
-                draw.text((0, 52), line3, font=self._font, fill=255)
+        frame = self._image_mod.new("1", (self.device.width, self.device.height))
+        frame.paste(self._header_img, (0, 0))
+        frame.paste(self._key_img, (0, 14))
+
+        draw = self._draw_mod.Draw(frame)
+        draw.text((0, 28), line1, font=self._font, fill=255)
+        if line2:
+            draw.text((0, 40), line2, font=self._font, fill=255)
+        if line3:
+            draw.text((0, 52), line3, font=self._font, fill=255)
+
+        self.device.display(frame)
 
         ERRORS.mark_clean()
 
@@ -580,15 +882,33 @@ class OledManager:
 def is_contact_open(pin: int) -> bool:
     return GPIO.input(pin) == GPIO.HIGH  # pull-up; HIGH means OPEN
 
+def _on_edge(zone_key: str) -> None:
+    # Runs on RPi.GPIO's single callback thread, which serializes ALL zone
+    # edges — never sleep or publish here. Debounce is handled by the
+    # kernel-side bouncetime; the hand-off must stay non-blocking.
+    _EDGE_QUEUE.put_nowait(zone_key)
+
 def _gpio_setup_for_zone(zone_key: str) -> None:
     meta = SENSORS[zone_key]
     pin = int(meta["pin"])
     cls = meta.get("device_class", "opening")
 
     if is_output_class(cls):
+        _polled_keys.discard(zone_key)
         GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)  # default OFF
     else:
         GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        try:
+            GPIO.add_event_detect(
+                pin, GPIO.BOTH,
+                callback=lambda ch, zk=zone_key: _on_edge(zk),
+                bouncetime=BOUNCE_MS,
+            )
+            _polled_keys.discard(zone_key)
+        except RuntimeError:
+            # Edge detection unavailable (e.g. pin claimed); poll it instead.
+            _polled_keys.add(zone_key)
+    _rebuild_poll_rows()
 
 def setup_gpio() -> None:
     GPIO.setmode(GPIO.BCM)
@@ -600,6 +920,78 @@ def setup_gpio() -> None:
     # Night Light pin
     GPIO.setup(LED_GPIO, GPIO.OUT, initial=(GPIO.LOW if LED_ACTIVE_HIGH else GPIO.HIGH))
 
+# Second-tier fallback when RPi.GPIO edge detection is unavailable: arm the
+# kernel's sysfs GPIO edge notification and epoll the value files, so even
+# "polled" zones idle in the kernel instead of ticking in Python.
+_SYSFS_GPIO_ROOT = "/sys/class/gpio"
+
+def _sysfs_edge_fd(pin: int) -> Optional[int]:
+    """Exports the pin with edge=both and returns an fd on its value file."""
+    base = f"{_SYSFS_GPIO_ROOT}/gpio{pin}"
+    try:
+        if not os.path.isdir(base):
+            with open(f"{_SYSFS_GPIO_ROOT}/export", "w") as f:
+                f.write(str(pin))
+        with open(f"{base}/edge", "w") as f:
+            f.write("both")
+        return os.open(f"{base}/value", os.O_RDONLY | os.O_NONBLOCK)
+    except Exception:
+        return None
+
+def _sysfs_watcher_loop(ep, fd_to_zone: Dict[int, str]) -> None:
+    while RUNNING:
+        try:
+            events = ep.poll(1.0)
+        except Exception:
+            return
+        for fd, _mask in events:
+            try:
+                os.pread(fd, 8, 0)  # re-arm the edge notification
+            except Exception:
+                continue
+            zone_key = fd_to_zone.get(fd)
+            if zone_key is not None:
+                _EDGE_QUEUE.put(zone_key)
+
+def _start_sysfs_watcher() -> None:
+    """Moves poll-fallback zones onto epoll; failures stay in _polled_keys."""
+    if not _polled_keys:
+        return
+    # Drop any batched gpiod claim first: a held line request makes the
+    # sysfs exports below fail with EBUSY, which would silently pin every
+    # zone to the poll loop. _rebuild_poll_rows re-claims whatever the
+    # epoll path couldn't take.
+    _release_gpiod_request()
+    try:
+        ep = select.epoll()
+    except Exception:
+        _rebuild_gpiod_request()
+        return
+    fd_to_zone: Dict[int, str] = {}
+    for k in list(_polled_keys):
+        fd = _sysfs_edge_fd(int(SENSORS[k]["pin"]))
+        if fd is None:
+            continue
+        try:
+            os.pread(fd, 8, 0)
+            ep.register(fd, select.EPOLLPRI | select.EPOLLERR)
+        except Exception:
+            try:
+                os.close(fd)
+            except Exception:
+                pass
+            continue
+        fd_to_zone[fd] = k
+        _polled_keys.discard(k)
+    _rebuild_poll_rows()
+    if fd_to_zone:
+        threading.Thread(target=_sysfs_watcher_loop, args=(ep, fd_to_zone), daemon=True).start()
+    else:
+        try:
+            ep.close()
+        except Exception:
+            pass
+
 def get_output_state(zone_key: str) -> str:
     pin = int(SENSORS[zone_key]["pin"])
     return "ON" if GPIO.input(pin) == GPIO.HIGH else "OFF"
@@ -625,8 +1017,8 @@ def night_light_set(on: bool) -> None:
 # ============================================================
 def update_door_open_state() -> None:
     open_keys = get_open_keys_ordered()
-    with _state_lock:
-        changed_key = _last_contact_change_key
+    change = _last_change
+    changed_key = change[0] if change else None
     changed_name = SENSORS.get(changed_key, {}).get("name", "n/a") if changed_key else "n/a"
 
     if open_keys:
@@ -651,32 +1043,123 @@ def _reason_code_to_int(rc) -> int:
     except Exception:
         return -1
 
+# Tracks whether MQTT_PUB_FAIL is currently raised so the success path can
+# skip the ErrorBus lock entirely (clear_error per publish adds up).
+_MQTT_ERR_ACTIVE = False
+
+# Latest payload per topic queued while the broker is unreachable, flushed
+# as one snapshot by _on_connect. Newer writes overwrite older ones, so an
+# outage costs one publish per touched topic instead of one per attempt.
+_offline_lock = threading.Lock()
+_offline_pending: Dict[str, Tuple[str, int, bool, str]] = {}
+
 def safe_publish(client, topic: str, payload: str, qos=1, retain=True, context: str = ""):
+    global _MQTT_ERR_ACTIVE
+    if not _mqtt_ok:
+        with _offline_lock:
+            _offline_pending[topic] = (payload, qos, retain, context)
+        return None
     try:
-        client.publish(topic, payload, qos=qos, retain=retain)
-        ERRORS.clear_error("MQTT_PUB_FAIL", kind="error")
+        info = client.publish(topic, payload, qos=qos, retain=retain)
+        if _MQTT_ERR_ACTIVE:
+            _MQTT_ERR_ACTIVE = False
+            ERRORS.clear_error("MQTT_PUB_FAIL", kind="error")
+        return info
     except Exception as e:
+        _MQTT_ERR_ACTIVE = True
         ERRORS.raise_error("MQTT_PUB_FAIL", f"MQTT publish failed: {context} {e}", P_HIGH, kind="error")
+        return None
+
+# Last published payload hash per topic, so retained topics aren't re-sent
+# when nothing changed (discovery bursts at boot / class changes).
+_pub_cache_lock = threading.Lock()
+_last_pub_hash: Dict[str, bytes] = {}
+
+def _forget_pub_hash(topic: str) -> None:
+    with _pub_cache_lock:
+        _last_pub_hash.pop(topic, None)
+
+def safe_publish_cached(client, topic: str, payload: str, qos=1, retain=True, context: str = ""):
+    h = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+    with _pub_cache_lock:
+        if _last_pub_hash.get(topic) == h:
+            return
+    # Record the hash only once the publish was actually handed to paho;
+    # a failed (or offline-buffered) attempt must stay retryable.
+    info = safe_publish(client, topic, payload, qos=qos, retain=retain, context=context)
+    if info is not None:
+        with _pub_cache_lock:
+            _last_pub_hash[topic] = h
+
+# ============================================================
+# Tap auto-off scheduler (one long-lived thread for all zones)
+# ============================================================
+_SCHED = sched.scheduler(time.monotonic, time.sleep)
+_sched_wake = threading.Event()
+_tap_lock = threading.Lock()
+_pending_off: Dict[str, Any] = {}  # zone_key -> sched event
+
+def _sched_loop() -> None:
+    while RUNNING:
+        delay = _SCHED.run(blocking=False)
+        _sched_wake.wait(timeout=delay if delay is not None else 1.0)
+        _sched_wake.clear()
+
+def _do_tap_off(client, zone_key: str) -> None:
+    with _tap_lock:
+        _pending_off.pop(zone_key, None)
+    try:
+        set_output_state(zone_key, False)
+        safe_publish(client, switch_state_topic(zone_key), "OFF", qos=1, retain=True,
+                     context=f"switch_state:{zone_key}:auto_off")
+    except Exception as e:
+        ERRORS.raise_error("GPIO_OUT", f"tap auto-off failed: {zone_key} {e}", P_HIGH, kind="error")
+
+def _schedule_tap_off(client, zone_key: str) -> None:
+    # Repeated taps on the same zone reschedule the pending OFF instead of
+    # stacking one sleeping thread per tap.
+    with _tap_lock:
+        ev = _pending_off.pop(zone_key, None)
+        if ev is not None:
+            try:
+                _SCHED.cancel(ev)
+            except ValueError:
+                pass
+        _pending_off[zone_key] = _SCHED.enter(OUTPUT_TAP_SEC, 1, _do_tap_off, (client, zone_key))
+    _sched_wake.set()
 
 # ============================================================
 # HA Discovery + entity publish
 # ============================================================
+_DEVICE_BLOCK_CACHED = {
+    "name": DEVICE_NAME,
+    "identifiers": [DEVICE_ID],
+    "manufacturer": "Raspberry Pi",
+    "model": f"GPIO IO ({HOST})",
+}
+
 def _device_block() -> dict:
-    return {
-        "name": DEVICE_NAME,
-        "identifiers": [DEVICE_ID],
-        "manufacturer": "Raspberry Pi",
-        "model": f"GPIO IO ({HOST})",
-    }
+    return _DEVICE_BLOCK_CACHED
 
 def _delete_discovery(client, topic: str, why: str = "") -> None:
+    _forget_pub_hash(topic)
     safe_publish(client, topic, "", qos=1, retain=True, context=f"delete:{why}")
 
+# Discovery payloads are deterministic per (zone, class); serialize once.
+_disc_json_cache: Dict[Tuple[str, str], str] = {}
+
 def publish_entity_discovery_one(client, zone_key: str) -> None:
-    avail = availability_topic()
+    avail = AVAILABILITY_TOPIC
     meta = SENSORS[zone_key]
     cls = meta.get("device_class", "opening")
 
+    cached = _disc_json_cache.get((zone_key, cls))
+    if cached is not None:
+        topic = switch_discovery_topic(zone_key) if is_output_class(cls) else contact_discovery_topic(zone_key)
+        ctx = f"discovery:{'switch' if is_output_class(cls) else 'binary'}:{zone_key}"
+        safe_publish_cached(client, topic, cached, qos=1, retain=True, context=ctx)
+        return
+
     if is_output_class(cls):
         payload = {
             "name": meta["name"],
@@ -693,8 +1176,10 @@ def publish_entity_discovery_one(client, zone_key: str) -> None:
             "icon": ICON_BY_CLASS.get(cls, "mdi:toggle-switch"),
             "device": _device_block(),
         }
-        safe_publish(client, switch_discovery_topic(zone_key), json.dumps(payload), qos=1, retain=True,
-                     context=f"discovery:switch:{zone_key}")
+        serialized = _dumps(payload)
+        _disc_json_cache[(zone_key, cls)] = serialized
+        safe_publish_cached(client, switch_discovery_topic(zone_key), serialized, qos=1, retain=True,
+                            context=f"discovery:switch:{zone_key}")
     else:
         payload = {
             "name": meta["name"],
@@ -708,17 +1193,19 @@ def publish_entity_discovery_one(client, zone_key: str) -> None:
             "device_class": cls,
             "device": _device_block(),
         }
-        safe_publish(client, contact_discovery_topic(zone_key), json.dumps(payload), qos=1, retain=True,
-                     context=f"discovery:binary:{zone_key}")
+        serialized = _dumps(payload)
+        _disc_json_cache[(zone_key, cls)] = serialized
+        safe_publish_cached(client, contact_discovery_topic(zone_key), serialized, qos=1, retain=True,
+                            context=f"discovery:binary:{zone_key}")
 
 def publish_entity_discovery_all(client) -> None:
     for key in SENSORS.keys():
         publish_entity_discovery_one(client, key)
 
-def publish_contact_state(client, sensor_key: str) -> None:
-    global _last_contact_change_key, _last_contact_change_is_open
+def publish_contact_state(client, sensor_key: str, *, force: bool = False) -> None:
+    global _contact_states, _contact_bitmask, _last_change
 
-    if is_output_class(SENSORS[sensor_key].get("device_class", "")):
+    if _IS_OUTPUT[sensor_key]:
         return
 
     pin = int(SENSORS[sensor_key]["pin"])
@@ -728,11 +1215,19 @@ def publish_contact_state(client, sensor_key: str) -> None:
     with _state_lock:
         prev = _contact_states.get(sensor_key, False)
         if prev != is_open:
-            _contact_states[sensor_key] = is_open
-            _last_contact_change_key = sensor_key
-            _last_contact_change_is_open = is_open
+            new_states = dict(_contact_states)
+            new_states[sensor_key] = is_open
+            _contact_states = new_states
+            bit = _ZONE_BIT[sensor_key]
+            _contact_bitmask = (_contact_bitmask | bit) if is_open else (_contact_bitmask & ~bit)
+            _last_change = (sensor_key, is_open)
             changed = True
 
+    # Retained topic already holds this value; don't re-send it unless a
+    # caller explicitly wants the retained state re-seated.
+    if not (changed or force):
+        return
+
     safe_publish(
         client,
         contact_state_topic(sensor_key),
@@ -743,15 +1238,39 @@ def publish_contact_state(client, sensor_key: str) -> None:
     )
 
     if changed:
-        SVC_LOG.info(f"SENSOR_CHANGE {sensor_key} -> {'OPEN' if is_open else 'CLOSED'}")
+        SVC_LOG.info("SENSOR_CHANGE %s -> %s", sensor_key, "OPEN" if is_open else "CLOSED")
+
+def _edge_publisher_loop(client) -> None:
+    """Drains zone keys queued by GPIO edge callbacks and publishes state."""
+    while RUNNING:
+        try:
+            zone_key = _EDGE_QUEUE.get(timeout=1.0)
+        except queue.Empty:
+            continue
+        # A bouncing contact queues several edges back to back; wait out
+        # the burst, then fold everything queued into one pass per zone.
+        # publish_contact_state reads the settled pin level and already
+        # skips publishing when it matches the last known state, so a
+        # flap that lands back where it started sends nothing.
+        time.sleep(_EDGE_COALESCE_SEC)
+        pending = {zone_key: None}
+        try:
+            while True:
+                pending[_EDGE_QUEUE.get_nowait()] = None
+        except queue.Empty:
+            pass
+        for zk in pending:
+            if _IS_OUTPUT.get(zk, False):
+                continue
+            publish_contact_state(client, zk)
 
-def publish_entity_state_one(client, zone_key: str) -> None:
+def publish_entity_state_one(client, zone_key: str, *, force: bool = False) -> None:
     cls = SENSORS[zone_key].get("device_class", "opening")
     if is_output_class(cls):
         safe_publish(client, switch_state_topic(zone_key), get_output_state(zone_key), qos=1, retain=True,
                      context=f"switch_state:{zone_key}")
     else:
-        publish_contact_state(client, zone_key)
+        publish_contact_state(client, zone_key, force=force)
 
 def publish_zone_class_select_discovery(client) -> None:
     device_block = _device_block()
@@ -762,13 +1281,13 @@ def publish_zone_class_select_discovery(client) -> None:
         "command_topic": TOP_ZONE_SET,
         "state_topic": TOP_ZONE_STATE,
         "options": ZONE_SELECT_OPTIONS,
-        "availability_topic": availability_topic(),
+        "availability_topic": AVAILABILITY_TOPIC,
         "payload_available": "online",
         "payload_not_available": "offline",
         "icon": "mdi:format-list-bulleted",
         "device": device_block,
     }
-    safe_publish(client, zone_select_discovery_topic(), json.dumps(zone_payload), qos=1, retain=True, context="select:zone")
+    safe_publish_cached(client, ZONE_SELECT_DISCOVERY_TOPIC, _dumps(zone_payload), qos=1, retain=True, context="select:zone")
 
     class_payload = {
         "name": f"{HOST} Class Select",
@@ -776,21 +1295,19 @@ def publish_zone_class_select_discovery(client) -> None:
         "command_topic": TOP_CLASS_SET,
         "state_topic": TOP_CLASS_STATE,
         "options": CLASS_SELECT_OPTIONS,
-        "availability_topic": availability_topic(),
+        "availability_topic": AVAILABILITY_TOPIC,
         "payload_available": "online",
         "payload_not_available": "offline",
         "icon": "mdi:tag-outline",
         "device": device_block,
     }
-    safe_publish(client, class_select_discovery_topic(), json.dumps(class_payload), qos=1, retain=True, context="select:class")
+    safe_publish_cached(client, CLASS_SELECT_DISCOVERY_TOPIC, _dumps(class_payload), qos=1, retain=True, context="select:class")
 
-    global _selected_zone, _selected_class
-    with _select_lock:
-        _selected_zone = ZONE_PLACEHOLDER
-        _selected_class = CLASS_PLACEHOLDER
+    global _selection
+    _selection = (ZONE_PLACEHOLDER, CLASS_PLACEHOLDER)
 
-    safe_publish(client, TOP_ZONE_STATE, ZONE_PLACEHOLDER, qos=1, retain=True, context="select:zone_default")
-    safe_publish(client, TOP_CLASS_STATE, CLASS_PLACEHOLDER, qos=1, retain=True, context="select:class_default")
+    safe_publish_cached(client, TOP_ZONE_STATE, ZONE_PLACEHOLDER, qos=1, retain=True, context="select:zone_default")
+    safe_publish_cached(client, TOP_CLASS_STATE, CLASS_PLACEHOLDER, qos=1, retain=True, context="select:class_default")
 
 def publish_night_light_discovery(client) -> None:
     payload = {
@@ -798,7 +1315,7 @@ def publish_night_light_discovery(client) -> None:
         "unique_id": f"{DEVICE_ID}_nightlight",
         "state_topic": LED_STATE_TOPIC,
         "command_topic": LED_CMD_TOPIC,
-        "availability_topic": availability_topic(),
+        "availability_topic": AVAILABILITY_TOPIC,
         "payload_available": "online",
         "payload_not_available": "offline",
         "payload_on": "ON",
@@ -808,7 +1325,7 @@ def publish_night_light_discovery(client) -> None:
         "icon": "mdi:lightbulb-on-outline",
         "device": _device_block(),
     }
-    safe_publish(client, LED_DISCOVERY_TOPIC, json.dumps(payload), qos=1, retain=True, context="discovery:nightlight")
+    safe_publish(client, LED_DISCOVERY_TOPIC, _dumps(payload), qos=1, retain=True, context="discovery:nightlight")
 
 def publish_night_light_state(client) -> None:
     safe_publish(client, LED_STATE_TOPIC, ("ON" if night_light_is_on() else "OFF"), qos=1, retain=True, context="nightlight:state")
@@ -818,10 +1335,10 @@ def _apply_zone_class_change(client, zone_key: str, new_class: str) -> None:
     new_class = str(new_class).strip().lower()
 
     if zone_key not in SENSORS:
-        SVC_LOG.warning(f"ZONE_CLASS_SET ignored: unknown zone '{zone_key}'")
+        SVC_LOG.warning("ZONE_CLASS_SET ignored: unknown zone '%s'", zone_key)
         return
     if new_class not in VALID_CLASSES:
-        SVC_LOG.warning(f"ZONE_CLASS_SET ignored: invalid class '{new_class}'")
+        SVC_LOG.warning("ZONE_CLASS_SET ignored: invalid class '%s'", new_class)
         return
 
     old = SENSORS[zone_key].get("device_class", "opening")
@@ -833,12 +1350,18 @@ def _apply_zone_class_change(client, zone_key: str, new_class: str) -> None:
 
     # 1) Persist
     SENSORS[zone_key]["device_class"] = new_class
-    persisted = load_zone_classes()
-    persisted[zone_key] = new_class
-    save_zone_classes(persisted)
+    _IS_OUTPUT[zone_key] = new_is_out
+    global _INPUT_MASK
+    _INPUT_MASK = _compute_input_mask()
+    _ZONE_CLASS_CACHE[zone_key] = new_class
+    save_zone_classes(_ZONE_CLASS_CACHE)
 
-    # 2) Reconfigure GPIO mode
+    # 2) Reconfigure GPIO mode (drop any existing edge detection first)
     try:
+        try:
+            GPIO.remove_event_detect(int(SENSORS[zone_key]["pin"]))
+        except Exception:
+            pass
         _gpio_setup_for_zone(zone_key)
     except Exception as e:
         ERRORS.raise_error("GPIO_MODE", f"GPIO mode set failed: {zone_key} {e}", P_HIGH, kind="error")
@@ -863,7 +1386,7 @@ def _apply_zone_class_change(client, zone_key: str, new_class: str) -> None:
     except Exception:
         pass
 
-    SVC_LOG.info(f"ZONE_CLASS_SET {zone_key}: {old} -> {new_class}")
+    SVC_LOG.info("ZONE_CLASS_SET %s: %s -> %s", zone_key, old, new_class)
 
 # ============================================================
 # MQTT callbacks
@@ -872,152 +1395,187 @@ def _on_connect(client, userdata, flags, reason_code=None, properties=None):
     global _mqtt_ok
     rc = _reason_code_to_int(reason_code)
     ok = (rc == 0)
-    with _state_lock:
-        _mqtt_ok = ok
+    _mqtt_ok = ok  # single global store; atomic under the GIL
 
     if ok:
         ERRORS.clear_error("MQTT_CONNECT", kind="error")
         ERRORS.clear_error("MQTT_DOWN", kind="error")
         SVC_LOG.info("MQTT connected")
+        # Replay whatever accumulated while we were down (latest per topic,
+        # in first-touched order).
+        with _offline_lock:
+            pending = list(_offline_pending.items())
+            _offline_pending.clear()
+        for topic, (payload, qos, retain, context) in pending:
+            safe_publish(client, topic, payload, qos=qos, retain=retain, context=context)
     else:
         ERRORS.raise_error("MQTT_CONNECT", f"MQTT connect rc={rc}", P_HIGH, kind="error")
 
+_last_mqtt_down_ts = 0.0
+_MQTT_DOWN_DEBOUNCE_SEC = 2.0
+
 def _on_disconnect(client, userdata, disconnect_flags=None, reason_code=None, properties=None):
-    global _mqtt_ok
-    with _state_lock:
-        _mqtt_ok = False
+    global _mqtt_ok, _last_mqtt_down_ts
+    _mqtt_ok = False
     rc = _reason_code_to_int(reason_code)
+    # Graceful disconnects (shutdown, rc=0) aren't errors, and paho is
+    # already reconnecting with backoff on flaky links — don't flood the
+    # bus with one MQTT_DOWN per drop.
+    if _shutdown_requested or rc == 0:
+        return
+    now = time.monotonic()
+    if now - _last_mqtt_down_ts < _MQTT_DOWN_DEBOUNCE_SEC:
+        return
+    _last_mqtt_down_ts = now
     ERRORS.raise_error("MQTT_DOWN", f"MQTT disconnected rc={rc}", P_HIGH, kind="error")
 
-def _on_message(client, userdata, msg):
-    """
-    Handles:
-    - Night Light command
-    - Select dropdowns (zone/class)
-    - Output switch commands (per-zone)
-    """
-    global _selected_zone, _selected_class
+def _handle_night_light(client, payload_b: bytes) -> None:
+    cmd_b = payload_b.upper()
+    if cmd_b in (b"ON", b"OFF"):
+        cmd = "ON" if cmd_b == b"ON" else "OFF"
+        try:
+            night_light_set(cmd == "ON")
+            publish_night_light_state(client)
+            SVC_LOG.info("NIGHT LIGHT -> %s", cmd)
+        except Exception as e:
+            ERRORS.raise_error("GPIO_LED", f"Night Light set failed: {e}", P_HIGH, kind="error")
 
-    try:
-        topic = (msg.topic or "").strip()
-        payload = msg.payload.decode("utf-8", errors="ignore").strip()
-    except Exception:
+def _handle_switch_command(client, zone_key: str, payload_b: bytes) -> None:
+    cls = SENSORS[zone_key].get("device_class", "")
+    if not is_output_class(cls):
         return
 
-    # -------- NIGHT LIGHT COMMAND --------
-    if topic == LED_CMD_TOPIC:
-        cmd = payload.upper()
-        if cmd in ("ON", "OFF"):
-            try:
-                night_light_set(cmd == "ON")
-                publish_night_light_state(client)
-                SVC_LOG.info(f"NIGHT LIGHT -> {cmd}")
-            except Exception as e:
-                ERRORS.raise_error("GPIO_LED", f"Night Light set failed: {e}", P_HIGH, kind="error")
+    cmd_b = payload_b.upper()
+    if cmd_b not in (b"ON", b"OFF"):
         return
+    cmd = "ON" if cmd_b == b"ON" else "OFF"
 
-    # -------- OUTPUT SWITCH COMMANDS --------
-    if topic.endswith("/switch/set"):
-        m = re.match(rf"^{re.escape(HOST)}_(zone\d+)/switch/set$", topic)
-        if not m:
-            return
-        zone_key = m.group(1)
-        if zone_key not in SENSORS:
+    try:
+        if cls == "output_toggle":
+            set_output_state(zone_key, cmd == "ON")
+            safe_publish(client, switch_state_topic(zone_key), cmd, qos=1, retain=True,
+                         context=f"switch_state:{zone_key}")
+            SVC_LOG.info("OUTPUT_TOGGLE %s -> %s", zone_key, cmd)
             return
 
-        cls = SENSORS[zone_key].get("device_class", "")
-        if not is_output_class(cls):
+        # cls == "output_tap"
+        if cmd == "OFF":
+            set_output_state(zone_key, False)
+            safe_publish(client, switch_state_topic(zone_key), "OFF", qos=1, retain=True,
+                         context=f"switch_state:{zone_key}:force_off")
+            SVC_LOG.info("OUTPUT_TAP %s -> OFF", zone_key)
             return
 
-        cmd = payload.upper()
-        if cmd not in ("ON", "OFF"):
-            return
+        # cmd == "ON": pulse ON then auto-OFF
+        set_output_state(zone_key, True)
+        safe_publish(client, switch_state_topic(zone_key), "ON", qos=1, retain=True,
+                     context=f"switch_state:{zone_key}:on")
 
-        try:
-            if cls == "output_toggle":
-                set_output_state(zone_key, cmd == "ON")
-                safe_publish(client, switch_state_topic(zone_key), cmd, qos=1, retain=True,
-                             context=f"switch_state:{zone_key}")
-                SVC_LOG.info(f"OUTPUT_TOGGLE {zone_key} -> {cmd}")
-                return
+        _schedule_tap_off(client, zone_key)
+        SVC_LOG.info("OUTPUT_TAP %s -> PULSE %ss", zone_key, OUTPUT_TAP_SEC)
 
-            # cls == "output_tap"
-            if cmd == "OFF":
-                set_output_state(zone_key, False)
-                safe_publish(client, switch_state_topic(zone_key), "OFF", qos=1, retain=True,
-                             context=f"switch_state:{zone_key}:force_off")
-                SVC_LOG.info(f"OUTPUT_TAP {zone_key} -> OFF")
-                return
+    except Exception as e:
+        ERRORS.raise_error("GPIO_OUT", f"GPIO output set failed: {zone_key} {e}", P_HIGH, kind="error")
 
-            # cmd == "ON": pulse ON then auto-OFF
-            set_output_state(zone_key, True)
-            safe_publish(client, switch_state_topic(zone_key), "ON", qos=1, retain=True,
-                         context=f"switch_state:{zone_key}:on")
-
-            def _auto_off():
-                try:
-                    time.sleep(OUTPUT_TAP_SEC)
-                    set_output_state(zone_key, False)
-                    safe_publish(client, switch_state_topic(zone_key), "OFF", qos=1, retain=True,
-                                 context=f"switch_state:{zone_key}:auto_off")
-                except Exception as e:
-                    ERRORS.raise_error("GPIO_OUT", f"tap auto-off failed: {zone_key} {e}", P_HIGH, kind="error")
-
-            threading.Thread(target=_auto_off, daemon=True).start()
-            SVC_LOG.info(f"OUTPUT_TAP {zone_key} -> PULSE {OUTPUT_TAP_SEC}s")
-            return
+def _handle_zone_select(client, payload_b: bytes) -> None:
+    global _selection
+    z = payload_b.decode("utf-8", errors="ignore")
 
-        except Exception as e:
-            ERRORS.raise_error("GPIO_OUT", f"GPIO output set failed: {zone_key} {e}", P_HIGH, kind="error")
-            return
+    if z == ZONE_PLACEHOLDER:
+        _selection = (ZONE_PLACEHOLDER, _selection[1])
+        safe_publish(client, TOP_ZONE_STATE, ZONE_PLACEHOLDER, qos=1, retain=True, context="zone_state:placeholder")
+        return
 
-    # -------- ZONE SELECT --------
-    if topic == TOP_ZONE_SET:
-        z = payload
+    if z not in SENSORS:
+        return
 
-        if z == ZONE_PLACEHOLDER:
-            with _select_lock:
-                _selected_zone = ZONE_PLACEHOLDER
-            safe_publish(client, TOP_ZONE_STATE, ZONE_PLACEHOLDER, qos=1, retain=True, context="zone_state:placeholder")
-            return
+    _selection = (z, _selection[1])
 
-        if z not in SENSORS:
-            return
+    safe_publish(client, TOP_ZONE_STATE, ZONE_PLACEHOLDER, qos=1, retain=True, context="zone_state:bounce")
+    SVC_LOG.info("SELECT zone -> %s (bounced to placeholder)", z)
 
-        with _select_lock:
-            _selected_zone = z
+def _handle_class_select(client, payload_b: bytes) -> None:
+    global _selection
+    c = payload_b.decode("utf-8", errors="ignore")
 
-        safe_publish(client, TOP_ZONE_STATE, ZONE_PLACEHOLDER, qos=1, retain=True, context="zone_state:bounce")
-        SVC_LOG.info(f"SELECT zone -> {z} (bounced to placeholder)")
+    if c == CLASS_PLACEHOLDER:
+        _selection = (_selection[0], CLASS_PLACEHOLDER)
+        safe_publish(client, TOP_CLASS_STATE, CLASS_PLACEHOLDER, qos=1, retain=True, context="class_state:placeholder")
         return
 
-    # -------- CLASS SELECT --------
-    if topic == TOP_CLASS_SET:
-        c = payload
+    c = c.lower()
+    if c not in VALID_CLASSES:
+        return
 
-        if c == CLASS_PLACEHOLDER:
-            with _select_lock:
-                _selected_class = CLASS_PLACEHOLDER
-            safe_publish(client, TOP_CLASS_STATE, CLASS_PLACEHOLDER, qos=1, retain=True, context="class_state:placeholder")
-            return
+    z = _selection[0]
+    _selection = (z, c)
 
-        c = c.lower()
-        if c not in VALID_CLASSES:
-            return
+    if z in SENSORS:
+        _apply_zone_class_change(client, z, c)
+        SVC_LOG.info("SELECT class -> %s (applied to %s)", c, z)
+    else:
+        SVC_LOG.info("SELECT class -> %s (no zone selected; ignored)", c)
 
-        with _select_lock:
-            _selected_class = c
-            z = _selected_zone
+    safe_publish(client, TOP_CLASS_STATE, CLASS_PLACEHOLDER, qos=1, retain=True, context="class_state:bounce")
 
-        if z in SENSORS:
-            _apply_zone_class_change(client, z, c)
-            SVC_LOG.info(f"SELECT class -> {c} (applied to {z})")
-        else:
-            SVC_LOG.info(f"SELECT class -> {c} (no zone selected; ignored)")
+# Exact-topic dispatch; per-zone switch commands resolve via _TOPIC_TO_ZONE.
+_TOPIC_HANDLERS = {
+    LED_CMD_TOPIC: _handle_night_light,
+    TOP_ZONE_SET: _handle_zone_select,
+    TOP_CLASS_SET: _handle_class_select,
+}
+
+# Inbound commands are handed off to a worker thread so paho's network
+# thread never runs handler work (GPIO writes, class-change file I/O,
+# discovery republish bursts) while the socket waits behind it. Bounded:
+# every command topic is last-write-wins, so on overflow the oldest
+# queued command is the right one to drop.
+_CMD_Q_MAX = 64
+_CMD_QUEUE: "queue.Queue[Tuple[str, bytes]]" = queue.Queue(maxsize=_CMD_Q_MAX)
+
+def _cmd_worker_loop(client) -> None:
+    while RUNNING:
+        try:
+            topic, payload_b = _CMD_QUEUE.get(timeout=1.0)
+        except queue.Empty:
+            continue
 
-        safe_publish(client, TOP_CLASS_STATE, CLASS_PLACEHOLDER, qos=1, retain=True, context="class_state:bounce")
+        handler = _TOPIC_HANDLERS.get(topic)
+        if handler is not None:
+            handler(client, payload_b)
+            continue
+
+        zone_key = _TOPIC_TO_ZONE.get(topic)
+        if zone_key is not None:
+            _handle_switch_command(client, zone_key, payload_b)
+
+def _on_message(client, userdata, msg):
+    """
+    Queues for the command worker:
+    - Night Light command
+    - Select dropdowns (zone/class)
+    - Output switch commands (per-zone)
+    """
+    try:
+        topic = (msg.topic or "").strip()
+        # Keep the payload as bytes; ON/OFF commands never need a decoded
+        # str, and the select handlers decode lazily.
+        payload_b = (msg.payload or b"").strip()
+    except Exception:
         return
 
+    try:
+        _CMD_QUEUE.put_nowait((topic, payload_b))
+    except queue.Full:
+        try:
+            _CMD_QUEUE.get_nowait()  # drop oldest, keep the fresh command
+        except queue.Empty:
+            pass
+        try:
+            _CMD_QUEUE.put_nowait((topic, payload_b))
+        except queue.Full:
+            pass
+
 # ============================================================
 # MQTT setup
 # ============================================================
@@ -1027,7 +1585,8 @@ def setup_mqtt():
     if MQTT_USER:
         client.username_pw_set(MQTT_USER, MQTT_PASS)
 
-    client.will_set(availability_topic(), payload="offline", qos=1, retain=True)
+    client.will_set(AVAILABILITY_TOPIC, payload="offline", qos=1, retain=True)
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
 
     client.on_connect = _on_connect
     client.on_disconnect = _on_disconnect
@@ -1052,9 +1611,18 @@ def cleanup_discovery() -> bool:
         if MQTT_USER:
             client.username_pw_set(MQTT_USER, MQTT_PASS)
 
+        # safe_publish gates on _mqtt_ok, so this client must run the real
+        # connect callback and wait for it — otherwise every delete below
+        # just parks in the offline buffer and nothing is cleared.
+        client.on_connect = _on_connect
         client.connect(MQTT_HOST, MQTT_PORT, keepalive=30)
         client.loop_start()
-        time.sleep(0.5)
+        deadline = time.monotonic() + 5.0
+        while not _mqtt_ok and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if not _mqtt_ok:
+            print("Cleanup failed: MQTT connect timeout")
+            return False
 
         # Delete discovery configs for all zones (both forms)
         for key in SENSORS.keys():
@@ -1062,8 +1630,8 @@ def cleanup_discovery() -> bool:
             _delete_discovery(client, switch_discovery_topic(key), why="cleanup")
 
         # Deletes for selects
-        _delete_discovery(client, zone_select_discovery_topic(), why="cleanup")
-        _delete_discovery(client, class_select_discovery_topic(), why="cleanup")
+        _delete_discovery(client, ZONE_SELECT_DISCOVERY_TOPIC, why="cleanup")
+        _delete_discovery(client, CLASS_SELECT_DISCOVERY_TOPIC, why="cleanup")
 
         # Delete Night Light discovery
         _delete_discovery(client, LED_DISCOVERY_TOPIC, why="cleanup")
@@ -1088,8 +1656,9 @@ def cleanup_discovery() -> bool:
 # SIGNAL HANDLING
 # ============================================================
 def handle_exit(signum, frame):
-    global RUNNING
+    global RUNNING, _shutdown_requested
     RUNNING = False
+    _shutdown_requested = True
 
 # ============================================================
 # MAIN
@@ -1112,7 +1681,11 @@ def main() -> int:
     oled.start()
 
     if THROTTLE_MONITOR_ENABLED:
-        threading.Thread(target=throttle_monitor_loop, daemon=True).start()
+        _SCHED.enter(0, 1, _throttle_tick)
+
+    # Single scheduler thread shared by all tap auto-offs and the
+    # throttle poll
+    threading.Thread(target=_sched_loop, daemon=True).start()
 
     try:
         client = setup_mqtt()
@@ -1120,64 +1693,76 @@ def main() -> int:
         client = None
 
     if client:
+        # Handler work runs off the paho network thread (see _on_message)
+        threading.Thread(target=_cmd_worker_loop, args=(client,), daemon=True).start()
+
         # Online
-        safe_publish(client, availability_topic(), "online", qos=1, retain=True, context="availability:online")
+        safe_publish(client, AVAILABILITY_TOPIC, "online", qos=1, retain=True, context="availability:online")
+
+        # All subscriptions in one SUBSCRIBE packet (selects, night light,
+        # switch topics for any output zones)
+        sub_topics = [(TOP_ZONE_SET, 1), (TOP_CLASS_SET, 1), (LED_CMD_TOPIC, 1)]
+        sub_topics += [
+            (switch_command_topic(key), 1)
+            for key in SENSORS.keys()
+            if _IS_OUTPUT[key]
+        ]
+        try:
+            client.subscribe(sub_topics)
+        except Exception as e:
+            ERRORS.raise_error("MQTT_SUB", f"MQTT subscribe failed: {e}", P_HIGH, kind="error")
 
-        # Dropdowns
+        # Discovery + initial states, published back-to-back without waiting
         publish_zone_class_select_discovery(client)
-        client.subscribe(TOP_ZONE_SET, qos=1)
-        client.subscribe(TOP_CLASS_SET, qos=1)
-
-        # Night Light discovery + state + subscribe
         publish_night_light_discovery(client)
         publish_night_light_state(client)
-        client.subscribe(LED_CMD_TOPIC, qos=1)
-
-        # Zone discovery + initial states
         publish_entity_discovery_all(client)
         for key in SENSORS.keys():
-            publish_entity_state_one(client, key)
-
-        # Subscribe switch topics for any output zones
-        for key, meta in SENSORS.items():
-            if is_output_class(meta.get("device_class", "")):
-                client.subscribe(switch_command_topic(key), qos=1)
-
-    # Edge-detect if possible; poll fallback if not (INPUT zones only)
-    polled_keys: set[str] = set()
+            publish_entity_state_one(client, key, force=True)
 
-    def make_cb(sensor_key: str):
-        def _cb(channel):
-            time.sleep(0.02)
-            if client:
-                publish_contact_state(client, sensor_key)
-        return _cb
-
-    for key, meta in SENSORS.items():
-        if is_output_class(meta.get("device_class", "")):
-            continue
+        # One synchronous confirm for the whole startup burst; QoS1 in-order
+        # delivery means everything queued before it has flushed too.
+        tail = safe_publish(client, AVAILABILITY_TOPIC, "online", qos=1, retain=True,
+                            context="availability:online_confirm")
         try:
-            GPIO.add_event_detect(int(meta["pin"]), GPIO.BOTH, callback=make_cb(key), bouncetime=BOUNCE_MS)
-        except RuntimeError:
-            polled_keys.add(key)
+            if tail is not None:
+                tail.wait_for_publish(timeout=5.0)
+        except Exception:
+            pass
+
+    # Edge-detected zones publish via the queue consumer; the main loop only
+    # polls zones where add_event_detect failed (see _gpio_setup_for_zone).
+    # Before falling back to polling, try kernel edge notification via sysfs.
+    _start_sysfs_watcher()
+    if client:
+        threading.Thread(target=_edge_publisher_loop, args=(client,), daemon=True).start()
 
-    last_polled = {k: None for k in polled_keys}
+    last_polled: Dict[str, Optional[int]] = {k: None for k, _pin in _POLL_ROWS}
 
     last_agg_tick = 0.0
     AGG_SEC = 1.0
 
-    while RUNNING:
-        now = time.monotonic()
+    # Periodic forced republish to re-seat retained state on the broker.
+    last_keepalive = time.monotonic()
+    KEEPALIVE_SEC = 60.0
 
-        # Poll any sensors that couldn't use edge detection (INPUT zones only)
-        if polled_keys and client:
-            for k in list(polled_keys):
-                if is_output_class(SENSORS[k].get("device_class", "")):
-                    polled_keys.discard(k)
-                    continue
-                pin = int(SENSORS[k]["pin"])
-                v = GPIO.input(pin)
-                if last_polled[k] is None or v != last_polled[k]:
+    # Hot-loop hoists: resolve bound methods once, not per tick
+    _mono = time.monotonic
+    _sleep = time.sleep
+
+    while RUNNING:
+        now = _mono()
+
+        # Poll any sensors that couldn't use edge detection (INPUT zones
+        # only; _POLL_ROWS is kept free of outputs by the class-change
+        # path). Skipped entirely while the broker is down: the publishes
+        # would just fail per tick, and the keepalive below re-seeds the
+        # retained topics once the connection returns.
+        rows = _POLL_ROWS  # atomic snapshot; rebuilt on class/set changes
+        if rows and client and _mqtt_ok:
+            levels = _read_polled_levels(rows)
+            for (k, _pin), v in zip(rows, levels):
+                if last_polled.get(k) is None or v != last_polled[k]:
                     last_polled[k] = v
                     publish_contact_state(client, k)
 
@@ -1186,13 +1771,27 @@ def main() -> int:
             last_agg_tick = now
             update_door_open_state()
 
-        time.sleep(POLL_INTERVAL_SEC)
+        if client and now - last_keepalive >= KEEPALIVE_SEC:
+            last_keepalive = now
+            for k in SENSORS.keys():
+                if not _IS_OUTPUT[k]:
+                    publish_contact_state(client, k, force=True)
+
+        # Sleep until the earliest pending deadline rather than a fixed
+        # tick: interrupt-driven systems wake once per aggregate window,
+        # and only poll fallback keeps the short interval.
+        next_deadline = last_agg_tick + AGG_SEC
+        if client:
+            next_deadline = min(next_deadline, last_keepalive + KEEPALIVE_SEC)
+        if _POLL_ROWS and _mqtt_ok:
+            next_deadline = min(next_deadline, now + POLL_INTERVAL_SEC)
+        _sleep(max(0.0, next_deadline - _mono()))
 
     SVC_LOG.info("Shutting down...")
 
     try:
         if client:
-            safe_publish(client, availability_topic(), "offline", qos=1, retain=True, context="availability:offline")
+            safe_publish(client, AVAILABILITY_TOPIC, "offline", qos=1, retain=True, context="availability:offline")
             time.sleep(0.2)
             client.loop_stop()
             client.disconnect()